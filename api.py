@@ -5,17 +5,76 @@ Provides endpoints for player style prediction and similarity search
 Includes a beautiful web UI accessible at root URL
 """
 
+import os
+
+
+def _env_number(name: str, default, cast=int, minimum=None):
+    """Numeric setting from the environment; malformed or out-of-range values use default"""
+    raw = os.environ.get(name, '').strip()
+    if not raw:
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        value = None
+    # `not >=` also rejects NaN
+    if value is None or (minimum is not None and not value >= minimum):
+        print(f"⚠️  Ignoring {name}={raw!r}; using {default}")
+        return default
+    return value
+
+
+# Split BLAS/OpenMP threads across uvicorn workers (WEB_CONCURRENCY) so that
+# concurrent similarity queries do not oversubscribe the CPU. Must run before
+# NumPy is imported.
+_WORKERS = _env_number('WEB_CONCURRENCY', 1, minimum=1)
+_BLAS_THREADS = str(max(1, (os.cpu_count() or 1) // _WORKERS))
+for _var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+    os.environ.setdefault(_var, _BLAS_THREADS)
+
+import asyncio
+import gzip
+import threading
+from collections import OrderedDict
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
-import joblib
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field
+import hashlib
 import json
-import pandas as pd
 import numpy as np
+from functools import lru_cache
+from operator import itemgetter, mul
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+
+from style_features import group_nanmeans
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+try:
+    import csscompressor
+    import rjsmin
+except ImportError:  # minifiers are optional; the UI is served unminified
+    csscompressor = rjsmin = None
+
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # redis is optional; only the in-process LRU cache is used
+    aioredis = None
+    RedisError = OSError
+
+# Shared response cache for /similar_players (enabled when REDIS_URL is set)
+REDIS_URL = os.environ.get('REDIS_URL')
+SIMILAR_CACHE_TTL = _env_number('SIMILAR_CACHE_TTL', 21600, minimum=1)
+# Seconds to wait on Redis before treating a lookup as a miss
+REDIS_TIMEOUT = _env_number('REDIS_TIMEOUT', 0.1, cast=float, minimum=0.001)
+# Entries kept in the in-process /similar_players cache
+SIMILAR_LRU_SIZE = 4096
 
 # ============================================================================
 # PYDANTIC MODELS
@@ -23,6 +82,8 @@ from typing import List, Dict
 
 class PlayerAttributes(BaseModel):
     """Player attributes for style prediction"""
+    model_config = ConfigDict(extra='forbid', frozen=True)
+    
     movement_acceleration: float = Field(default=50, ge=0, le=100)
     movement_sprint_speed: float = Field(default=50, ge=0, le=100)
     skill_dribbling: float = Field(default=50, ge=0, le=100)
@@ -51,6 +112,16 @@ class PlayerPrediction(BaseModel):
     style: str
 
 
+class BatchPredictionRequest(BaseModel):
+    """Request for classifying several players at once"""
+    players: List[PlayerAttributes] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchPredictionResponse(BaseModel):
+    """Cluster predictions, in request order"""
+    predictions: List[PlayerPrediction]
+
+
 class SimilarPlayerRequest(BaseModel):
     """Request for similar players"""
     player_name: str = Field(..., min_length=1)
@@ -62,6 +133,16 @@ class SimilarPlayerResponse(BaseModel):
     similar_players: List[str]
 
 
+class BatchSimilarPlayerRequest(BaseModel):
+    """Request for the similar players of several players at once"""
+    queries: List[SimilarPlayerRequest] = Field(..., min_length=1, max_length=100)
+
+
+class BatchSimilarPlayerResponse(BaseModel):
+    """Similar players per query, in request order"""
+    results: List[SimilarPlayerResponse]
+
+
 # ============================================================================
 # FASTAPI APP
 # ============================================================================
@@ -72,856 +153,508 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Add CORS middleware
+# Add CORS middleware. The web UI is same-origin; CORS_ORIGINS (comma-separated)
+# lists any other browser origins allowed to call the API.
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.environ.get('CORS_ORIGINS', 'http://localhost:8000,http://127.0.0.1:8000').split(',')
+    if origin.strip()
+]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=CORS_ORIGINS,
+    allow_credentials=os.environ.get('CORS_ALLOW_CREDENTIALS', '').lower() in ('1', 'true', 'yes'),
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "If-None-Match"],
+    expose_headers=["ETag"],
+    max_age=86400,
+)
+
+# Browser cache lifetime (seconds) for the static web UI
+STATIC_MAX_AGE = 300
+
+
+def _precompress(data: bytes) -> Dict[str, bytes]:
+    """Identity, gzip and (when available) brotli encodings of a static asset"""
+    variants = {'identity': data, 'gzip': gzip.compress(data, compresslevel=9)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    return variants
+
+
+class PrebuiltResponse(Response):
+    """A response built once at import and sent unchanged on every request"""
+
+    async def __call__(self, scope, receive, send):
+        # Middleware (CORS) edits the outgoing header list in place, so every
+        # send gets its own copy to keep the shared response untouched
+        await send({"type": "http.response.start", "status": self.status_code,
+                    "headers": list(self.raw_headers)})
+        await send({"type": "http.response.body", "body": self.body})
+
+
+def _prebuild(variants: Dict[str, bytes], media_type: str,
+              headers: Dict[str, str]) -> Dict[str, Response]:
+    """Responses for every precompressed variant of an asset, plus its 304"""
+    headers = {**headers, 'Vary': 'Accept-Encoding'}
+    responses = {
+        encoding: PrebuiltResponse(
+            content=body, media_type=media_type,
+            headers=headers if encoding == 'identity' else {**headers, 'Content-Encoding': encoding}
+        )
+        for encoding, body in variants.items()
+    }
+    responses['not_modified'] = PrebuiltResponse(status_code=304, headers=headers)
+    return responses
+
+
+def _accepted_encodings(header: str) -> set:
+    """Content codings an Accept-Encoding header allows (q=0 refuses one)"""
+    accepted = set()
+    for token in header.split(','):
+        coding, *params = token.split(';')
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _negotiated_response(request: Request, responses: Dict[str, Response], etag: str) -> Response:
+    """Pick the prebuilt response matching the client's cache and encodings"""
+    if _not_modified(request, etag):
+        return responses['not_modified']
+    accepted = _accepted_encodings(request.headers.get('accept-encoding', ''))
+    for encoding in ('br', 'gzip'):
+        if encoding in responses and encoding in accepted:
+            return responses[encoding]
+    return responses['identity']
+
+
+# Lifetime (seconds) for the CSS/JS bundles; the page links them by content hash
+ASSET_MAX_AGE = 31536000
+
+
+def _minify(text: str, media_type: str) -> str:
+    """Minify a CSS or JavaScript asset"""
+    if csscompressor is None:
+        return text
+    if media_type.startswith('text/css'):
+        return csscompressor.compress(text)
+    return rjsmin.jsmin(text)
+
+
+def _etag(data: bytes) -> str:
+    """Strong ETag of a static payload"""
+    return '"' + hashlib.sha1(data).hexdigest() + '"'
+
+
+def _load_asset(filename: str, media_type: str) -> Tuple[Dict[str, Response], Dict[str, Response], str]:
+    """Read, minify and prebuild a static asset; returns (versioned, unversioned, etag)
+
+    Only the content-hashed URL is cacheable for good; the bare URL keeps the
+    short page lifetime so it never pins a stale bundle.
+    """
+    text = _minify((STATIC_DIR / filename).read_text(encoding='utf-8'), media_type)
+    data = text.encode('utf-8')
+    etag = _etag(data)
+    variants = _precompress(data)
+    versioned = _prebuild(variants, media_type, {
+        "Cache-Control": f"public, max-age={ASSET_MAX_AGE}, immutable", "ETag": etag
+    })
+    unversioned = _prebuild(variants, media_type, {
+        "Cache-Control": f"public, max-age={STATIC_MAX_AGE}", "ETag": etag
+    })
+    return versioned, unversioned, etag
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already matches the asset's ETag"""
+    if_none_match = request.headers.get('if-none-match', '')
+    return etag in (tag.strip() for tag in if_none_match.split(','))
+
+
+# The web UI is static, so its responses are built once at import
+STATIC_DIR = Path('static')
+_CSS_RESPONSES, _CSS_UNVERSIONED, _CSS_ETAG = _load_asset('app.css', 'text/css; charset=utf-8')
+_JS_RESPONSES, _JS_UNVERSIONED, _JS_ETAG = _load_asset(
+    'app.js', 'application/javascript; charset=utf-8'
+)
+_CSS_VERSION = _CSS_ETAG[1:13]
+_JS_VERSION = _JS_ETAG[1:13]
+# Link the bundles by content hash so a changed bundle gets a fresh URL
+_HTML_SHELL = (
+    (STATIC_DIR / 'index.html').read_text(encoding='utf-8')
+    .replace('/static/app.css', f'/static/app.css?v={_CSS_VERSION}')
+    .replace('/static/app.js', f'/static/app.js?v={_JS_VERSION}')
+)
+_INDEX_BYTES: bytes = _HTML_SHELL.encode('utf-8')
+_INDEX_ETAG = _etag(_INDEX_BYTES)
+_INDEX_RESPONSES = _prebuild(
+    _precompress(_INDEX_BYTES), "text/html; charset=utf-8",
+    {"Cache-Control": f"public, max-age={STATIC_MAX_AGE}", "ETag": _INDEX_ETAG}
 )
 
 # Global model artifacts
-scaler = None
-kmeans = None
 cluster_labels = None
-player_data = None
+cluster_labels_etag = None
+player_names = None
+player_info = None
+name_to_idx = None
+player_names_lower = None
+lower_name_to_idx = None
+scaler_mean = None
+scaler_scale = None
+player_attr_matrix = None
+attr_col_index = None
+style_group_cols = None
+style_empty_groups = None
+player_styles_scaled = None
+player_styles_sqnorm = None
+player_clusters = None
+player_query_scaled = None
+centroids = None
+centroid_sqnorm = None
+scaler_params = None
+centroid_rows = None
+redis_client = None
+similar_cache_prefix = None
 
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def create_style_dimensions(attributes: dict) -> np.ndarray:
-    """Convert raw FIFA attributes to 6 style dimensions"""
-    style_dims = {
-        'pace': ['movement_acceleration', 'movement_sprint_speed'],
-        'dribbling': ['skill_dribbling', 'skill_ball_control', 
-                     'movement_agility', 'movement_balance'],
-        'creativity': ['attacking_short_passing', 'skill_long_passing', 
-                      'mentality_vision', 'skill_curve'],
-        'finishing': ['attacking_finishing', 'power_shot_power', 
-                     'mentality_positioning'],
-        'defense': ['mentality_interceptions', 'defending_standing_tackle', 
-                   'defending_sliding_tackle', 'mentality_aggression'],
-        'physicality': ['power_strength', 'power_stamina', 'power_jumping']
-    }
+STYLE_DIMENSIONS = {
+    'pace': ['movement_acceleration', 'movement_sprint_speed'],
+    'dribbling': ['skill_dribbling', 'skill_ball_control',
+                 'movement_agility', 'movement_balance'],
+    'creativity': ['attacking_short_passing', 'skill_long_passing',
+                  'mentality_vision', 'skill_curve'],
+    'finishing': ['attacking_finishing', 'power_shot_power',
+                 'mentality_positioning'],
+    'defense': ['mentality_interceptions', 'defending_standing_tackle',
+               'defending_sliding_tackle', 'mentality_aggression'],
+    'physicality': ['power_strength', 'power_stamina', 'power_jumping']
+}
+
+_ATTR_ORDER = tuple(PlayerAttributes.model_fields)
+
+
+def _build_group_matrix() -> np.ndarray:
+    """Build the (6 x 20) averaging matrix mapping attributes to style dimensions"""
+    matrix = np.zeros((len(STYLE_DIMENSIONS), len(_ATTR_ORDER)))
+    for row, attrs in enumerate(STYLE_DIMENSIONS.values()):
+        for attr in attrs:
+            matrix[row, _ATTR_ORDER.index(attr)] = 1.0 / len(attrs)
+    return matrix
+
+
+_GROUP_MATRIX = _build_group_matrix()
+
+
+# (attribute getter, averaging weight) per style dimension, over _ATTR_ORDER tuples
+_STYLE_GROUPS = tuple(
+    (itemgetter(*(_ATTR_ORDER.index(attr) for attr in attrs)), 1.0 / len(attrs))
+    for attrs in STYLE_DIMENSIONS.values()
+)
+
+
+def attribute_values(attributes: PlayerAttributes) -> Tuple[float, ...]:
+    """Attribute values of a request model, in _ATTR_ORDER"""
+    # Field values are stored in declaration order, which is _ATTR_ORDER
+    return tuple(attributes.__dict__.values())
+
+
+def canonical_attributes(matrix: np.ndarray, col_index: Dict[str, int]) -> np.ndarray:
+    """(N, 20) float64 matrix of the request attributes; missing columns default to 50"""
+    canonical = np.full((len(matrix), len(_ATTR_ORDER)), 50.0)
+    for j, attr in enumerate(_ATTR_ORDER):
+        if attr in col_index:
+            canonical[:, j] = matrix[:, col_index[attr]]
+    return canonical
+
+
+DATASET_STYLE_DIMENSIONS = {
+    'pace': ['movement_acceleration', 'movement_sprint_speed',
+            'acceleration', 'sprint_speed'],
+    'dribbling': ['skill_dribbling', 'skill_ball_control',
+                 'movement_agility', 'movement_balance',
+                 'dribbling', 'ball_control', 'agility', 'balance'],
+    'creativity': ['attacking_short_passing', 'skill_long_passing',
+                  'mentality_vision', 'skill_curve',
+                  'short_passing', 'long_passing', 'vision', 'curve'],
+    'finishing': ['attacking_finishing', 'power_shot_power',
+                 'mentality_positioning',
+                 'finishing', 'shot_power', 'positioning'],
+    'defense': ['mentality_interceptions', 'defending_standing_tackle',
+               'defending_sliding_tackle', 'mentality_aggression',
+               'interceptions', 'standing_tackle', 'sliding_tackle',
+               'aggression'],
+    'physicality': ['power_strength', 'power_stamina', 'power_jumping',
+                   'strength', 'stamina', 'jumping']
+}
+
+
+def build_style_groups(col_index: Dict[str, int]) -> Tuple[List[List[int]], List[int]]:
+    """Attribute column indices per style dimension, plus dimensions with no columns"""
+    group_cols = [[col_index[col] for col in attrs if col in col_index]
+                  for attrs in DATASET_STYLE_DIMENSIONS.values()]
+    empty_groups = [i for i, cols in enumerate(group_cols) if not cols]
+    return group_cols, empty_groups
+
+
+def create_style_dimensions_batch(matrix: np.ndarray, group_cols: List[List[int]],
+                                  empty_groups: List[int]) -> np.ndarray:
+    """Create style dimensions for every row of an attribute matrix"""
+    result = np.empty((len(matrix), len(group_cols)), dtype=np.float32)
+    result[:, empty_groups] = 50.0
     
-    dimensions = []
-    for dimension, attrs in style_dims.items():
-        values = [attributes.get(attr, 50) for attr in attrs]
-        dimensions.append(np.mean(values))
+    # NaN-aware group means (matches pandas' skipna mean)
+    present = [i for i, cols in enumerate(group_cols) if cols]
+    if present:
+        result[:, present] = group_nanmeans(
+            matrix, [group_cols[i] for i in present], dtype=np.float32
+        )
     
-    return np.array(dimensions)
-
-
-def create_style_dimensions_batch(df: pd.DataFrame) -> np.ndarray:
-    """Create style dimensions for entire dataframe"""
-    style_dims = {
-        'pace': ['movement_acceleration', 'movement_sprint_speed',
-                'acceleration', 'sprint_speed'],
-        'dribbling': ['skill_dribbling', 'skill_ball_control', 
-                     'movement_agility', 'movement_balance',
-                     'dribbling', 'ball_control', 'agility', 'balance'],
-        'creativity': ['attacking_short_passing', 'skill_long_passing', 
-                      'mentality_vision', 'skill_curve',
-                      'short_passing', 'long_passing', 'vision', 'curve'],
-        'finishing': ['attacking_finishing', 'power_shot_power', 
-                     'mentality_positioning',
-                     'finishing', 'shot_power', 'positioning'],
-        'defense': ['mentality_interceptions', 'defending_standing_tackle', 
-                   'defending_sliding_tackle', 'mentality_aggression',
-                   'interceptions', 'standing_tackle', 'sliding_tackle', 
-                   'aggression'],
-        'physicality': ['power_strength', 'power_stamina', 'power_jumping',
-                       'strength', 'stamina', 'jumping']
-    }
+    return result
+
+
+def scale_features(features: np.ndarray) -> np.ndarray:
+    """Standardize style vectors with the cached StandardScaler parameters"""
+    return (np.atleast_2d(features) - scaler_mean) / scaler_scale
+
+
+def predict_clusters(features_scaled: np.ndarray) -> np.ndarray:
+    """Assign scaled style vectors to their nearest KMeans centroid"""
+    # ||x - c||^2 = ||x||^2 + ||c||^2 - 2x.c; ||x||^2 is constant per row
+    distances = centroid_sqnorm - 2.0 * (np.atleast_2d(features_scaled) @ centroids.T)
+    return distances.argmin(axis=1)
+
+
+# Per-thread scratch arrays for rank_similar: searches run in worker threads,
+# so a single shared buffer would be overwritten mid-ranking
+_scratch = threading.local()
+
+
+def _scratch_buffer(name: str, size: int, dtype) -> np.ndarray:
+    """This thread's reusable length-size buffer called name"""
+    buf = getattr(_scratch, name, None)
+    if buf is None or buf.shape[0] != size:
+        buf = np.empty(size, dtype=dtype)
+        setattr(_scratch, name, buf)
+    return buf
+
+
+def _pool_size(k: int) -> int:
+    """Candidates kept from the fast distance scan before the exact rerank"""
+    return min(max(4 * k, 64), len(player_styles_scaled))
+
+
+def _rerank_exact(candidates: np.ndarray, queries_scaled: np.ndarray, k: int) -> np.ndarray:
+    """The k nearest of each row's candidates on exact float64 squared distances
+
+    The fast scan's ||x||^2 - 2x.q form loses precision between close
+    players; reranking on (x - q)^2, with ties going to the lower row index,
+    gives both similarity endpoints the same deterministic answer.
+    """
+    candidates = np.sort(candidates, axis=1)
+    diff = (player_styles_scaled[candidates].astype(np.float64)
+            - queries_scaled[:, None, :].astype(np.float64))
+    distances = np.einsum('mij,mij->mi', diff, diff)
+    order = np.argsort(distances, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def rank_similar(query_scaled: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k players closest to a scaled style vector, nearest first"""
+    query_scaled = np.asarray(query_scaled, dtype=np.float32)
+    # ||x - q||^2 = ||x||^2 - 2x.q + ||q||^2; ||q||^2 is the same for every
+    # row, so one matrix-vector product scores the whole matrix
+    distances = np.matmul(player_styles_scaled, query_scaled,
+                          out=_scratch_buffer('distances', len(player_styles_scaled), np.float32))
+    distances *= -2.0
+    distances += player_styles_sqnorm
+    pool = _pool_size(k)
+    candidates = np.argpartition(distances, pool - 1)[:pool]
+    return _rerank_exact(candidates[None, :], query_scaled[None, :], k)[0]
+
+
+def rank_similar_batch(queries_scaled: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k players closest to each scaled style vector, nearest first"""
+    queries_scaled = np.asarray(queries_scaled, dtype=np.float32)
+    # One (M, N) product scores every query against every player; each row's
+    # candidate pool then goes through the same exact rerank as rank_similar
+    scores = player_styles_sqnorm - 2.0 * (queries_scaled @ player_styles_scaled.T)
+    pool = _pool_size(k)
+    candidates = np.argpartition(scores, pool - 1, axis=1)[:, :pool]
+    return _rerank_exact(candidates, queries_scaled, k)
+
+
+def find_player_exact(player_name: str) -> Optional[Tuple[int, str]]:
+    """Row index and name column of the player named player_name (any case)"""
+    exact = name_to_idx.get(player_name)
+    if exact is not None:
+        return exact
+    return lower_name_to_idx.get(player_name.lower())
+
+
+def find_player(player_name: str) -> Optional[Tuple[int, str]]:
+    """Row index and name column of the player named (or whose name contains) player_name"""
+    exact = find_player_exact(player_name)
+    if exact is not None:
+        return exact
     
-    feature_matrix = []
-    for dimension, attrs in style_dims.items():
-        available_attrs = [col for col in attrs if col in df.columns]
-        if available_attrs:
-            feature_matrix.append(df[available_attrs].mean(axis=1).values)
-        else:
-            feature_matrix.append(np.full(len(df), 50))
+    query = player_name.lower()
+    for name_col, names in player_names_lower.items():
+        hits = np.flatnonzero(np.char.find(names, query) >= 0)
+        if len(hits):
+            return int(hits[0]), name_col
+    return None
+
+
+def player_info_int(key: str, player_idx: int) -> Optional[int]:
+    """Integer metadata of one player; None when absent (stored as -1 when missing)"""
+    if key not in player_info:
+        return None
+    value = int(player_info[key][player_idx])
+    return value if value >= 0 else None
+
+
+def create_style_dimensions_scalar(attrs: Tuple[float, ...]) -> List[float]:
+    """Six style dimensions of one attribute tuple, in plain Python"""
+    return [sum(group(attrs)) * weight for group, weight in _STYLE_GROUPS]
+
+
+def predict_cluster_scalar(features: List[float]) -> int:
+    """Nearest centroid of one unscaled style vector, in plain Python"""
+    # Six dimensions against six centroids: cheaper than building arrays
+    scaled = [(value - mean) / scale for value, (mean, scale) in zip(features, scaler_params)]
+    best_id, best_dist = 0, float('inf')
+    for cluster_id, (sqnorm, centroid) in enumerate(centroid_rows):
+        dist = sqnorm - 2.0 * sum(map(mul, scaled, centroid))
+        if dist < best_dist:
+            best_id, best_dist = cluster_id, dist
+    return best_id
+
+
+@lru_cache(maxsize=4096)
+def _predict_core(attrs: Tuple[float, ...]) -> Tuple[int, str]:
+    """Cluster ID and style for a tuple of attributes in _ATTR_ORDER"""
+    cluster_id = predict_cluster_scalar(create_style_dimensions_scalar(attrs))
+    return cluster_id, cluster_labels[str(cluster_id)]
+
+
+def _similar_core(player_name: str, top_n: int) -> Tuple[str, ...]:
+    """Names of the top_n players closest in style to the named player"""
+    match = find_player(player_name)
+    if match is None:
+        raise HTTPException(
+            status_code=404, 
+            detail=f"Player '{player_name}' not found in dataset"
+        )
+    player_idx, name_col_used = match
     
-    return np.array(feature_matrix).T
+    # Get top N similar (excluding the player itself)
+    similar_indices = rank_similar(player_query_scaled[player_idx], top_n + 1)[1:]
+    return tuple(player_names[name_col_used][similar_indices].tolist())
 
 
-# ============================================================================
-# WEB UI HTML
-# ============================================================================
+def _similar_batch_core(queries: Tuple[Tuple[str, int], ...]) -> List[Tuple[str, ...]]:
+    """Names of the top_n players closest in style to each named player"""
+    matches = []
+    for player_name, _ in queries:
+        match = find_player(player_name)
+        if match is None:
+            raise HTTPException(
+                status_code=404, 
+                detail=f"Player '{player_name}' not found in dataset"
+            )
+        matches.append(match)
+    
+    # Rank for the largest top_n (plus the player itself) and trim per query
+    rows = [player_idx for player_idx, _ in matches]
+    ranked = rank_similar_batch(player_query_scaled[rows], max(n for _, n in queries) + 1)
+    return [
+        tuple(player_names[name_col_used][ranked[i, 1:top_n + 1]].tolist())
+        for i, ((_, top_n), (_, name_col_used)) in enumerate(zip(queries, matches))
+    ]
 
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>⚽ Football Player Style Clustering</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        
-        .header {
-            text-align: center;
-            color: white;
-            margin-bottom: 40px;
-        }
-        
-        .header h1 {
-            font-size: 3em;
-            margin-bottom: 10px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }
-        
-        .header p {
-            font-size: 1.2em;
-            opacity: 0.9;
-        }
-        
-        .card {
-            background: white;
-            border-radius: 20px;
-            padding: 30px;
-            margin-bottom: 30px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-        }
-        
-        .tabs {
-            display: flex;
-            gap: 10px;
-            margin-bottom: 30px;
-            border-bottom: 2px solid #e0e0e0;
-        }
-        
-        .tab {
-            padding: 15px 30px;
-            background: none;
-            border: none;
-            font-size: 1.1em;
-            cursor: pointer;
-            transition: all 0.3s;
-            border-bottom: 3px solid transparent;
-            color: #666;
-        }
-        
-        .tab.active {
-            color: #667eea;
-            border-bottom-color: #667eea;
-            font-weight: 600;
-        }
-        
-        .tab:hover {
-            color: #667eea;
-        }
-        
-        .tab-content {
-            display: none;
-        }
-        
-        .tab-content.active {
-            display: block;
-            animation: fadeIn 0.3s;
-        }
-        
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(10px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-        
-        .form-group {
-            margin-bottom: 20px;
-        }
-        
-        label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-            color: #333;
-        }
-        
-        input[type="text"],
-        input[type="number"] {
-            width: 100%;
-            padding: 12px;
-            border: 2px solid #e0e0e0;
-            border-radius: 10px;
-            font-size: 1em;
-            transition: border-color 0.3s;
-        }
-        
-        input:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        
-        .attribute-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin-bottom: 20px;
-        }
-        
-        .attribute-item {
-            display: flex;
-            flex-direction: column;
-        }
-        
-        .attribute-item label {
-            font-size: 0.9em;
-            margin-bottom: 5px;
-        }
-        
-        .attribute-item input {
-            padding: 10px;
-        }
-        
-        button {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 15px 40px;
-            border: none;
-            border-radius: 10px;
-            font-size: 1.1em;
-            font-weight: 600;
-            cursor: pointer;
-            transition: transform 0.2s, box-shadow 0.2s;
-            box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
-        }
-        
-        button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(102, 126, 234, 0.6);
-        }
-        
-        button:active {
-            transform: translateY(0);
-        }
-        
-        .result {
-            margin-top: 30px;
-            padding: 25px;
-            background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-            border-radius: 15px;
-            display: none;
-        }
-        
-        .result.show {
-            display: block;
-            animation: slideUp 0.4s;
-        }
-        
-        @keyframes slideUp {
-            from { opacity: 0; transform: translateY(20px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-        
-        .result h3 {
-            color: #667eea;
-            margin-bottom: 15px;
-            font-size: 1.5em;
-        }
-        
-        .result-content {
-            font-size: 1.1em;
-            line-height: 1.6;
-        }
-        
-        .cluster-badge {
-            display: inline-block;
-            padding: 10px 20px;
-            background: #667eea;
-            color: white;
-            border-radius: 25px;
-            font-weight: 600;
-            margin-top: 10px;
-        }
-        
-        .player-list {
-            list-style: none;
-            padding: 0;
-        }
-        
-        .player-list li {
-            padding: 12px;
-            margin: 8px 0;
-            background: white;
-            border-radius: 10px;
-            border-left: 4px solid #667eea;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        }
-        
-        .loading {
-            display: none;
-            text-align: center;
-            padding: 20px;
-        }
-        
-        .loading.show {
-            display: block;
-        }
-        
-        .spinner {
-            border: 4px solid #f3f3f3;
-            border-top: 4px solid #667eea;
-            border-radius: 50%;
-            width: 40px;
-            height: 40px;
-            animation: spin 1s linear infinite;
-            margin: 0 auto;
-        }
-        
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-        
-        .error {
-            background: #fee;
-            color: #c33;
-            padding: 15px;
-            border-radius: 10px;
-            margin-top: 20px;
-            display: none;
-        }
-        
-        .error.show {
-            display: block;
-        }
-        
-        .quick-select {
-            display: flex;
-            gap: 10px;
-            margin-bottom: 20px;
-            flex-wrap: wrap;
-        }
-        
-        .quick-select button {
-            padding: 10px 20px;
-            font-size: 0.9em;
-            background: #f0f0f0;
-            color: #333;
-            box-shadow: none;
-        }
-        
-        .quick-select button:hover {
-            background: #667eea;
-            color: white;
-        }
-        
-        .info-box {
-            background: #e3f2fd;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-            border-left: 4px solid #2196f3;
-        }
-        
-        .info-box h4 {
-            color: #1976d2;
-            margin-bottom: 10px;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>⚽ Football Player Style Clustering</h1>
-            <p>ML-Powered Player Scouting Intelligence System</p>
-        </div>
-        
-        <div class="card">
-            <div class="tabs">
-                <button class="tab active" onclick="switchTab('predict')">🎯 Predict Style</button>
-                <button class="tab" onclick="switchTab('similar')">🔍 Find Similar Players</button>
-                <button class="tab" onclick="switchTab('clusters')">📊 View All Styles</button>
-            </div>
-            
-            <!-- Predict Style Tab -->
-            <div id="predict-tab" class="tab-content active">
-                <div class="info-box">
-                    <h4>How it works</h4>
-                    <p>Enter player attributes (0-100) to predict their playing style. The ML model will classify them into one of 6 distinct archetypes.</p>
-                </div>
-                
-                <div class="quick-select">
-                    <button onclick="loadPreset('winger')">⚡ Explosive Winger</button>
-                    <button onclick="loadPreset('playmaker')">🎨 Creative Playmaker</button>
-                    <button onclick="loadPreset('defender')">🛡️ Defender</button>
-                    <button onclick="loadPreset('striker')">⚽ Striker</button>
-                </div>
-                
-                <form id="predict-form">
-                    <h3 style="margin-bottom: 20px;">Player Attributes</h3>
-                    <div class="attribute-grid">
-                        <div class="attribute-item">
-                            <label>Acceleration</label>
-                            <input type="number" name="movement_acceleration" min="0" max="100" value="70" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Sprint Speed</label>
-                            <input type="number" name="movement_sprint_speed" min="0" max="100" value="70" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Dribbling</label>
-                            <input type="number" name="skill_dribbling" min="0" max="100" value="70" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Ball Control</label>
-                            <input type="number" name="skill_ball_control" min="0" max="100" value="70" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Agility</label>
-                            <input type="number" name="movement_agility" min="0" max="100" value="70" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Balance</label>
-                            <input type="number" name="movement_balance" min="0" max="100" value="70" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Short Passing</label>
-                            <input type="number" name="attacking_short_passing" min="0" max="100" value="70" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Long Passing</label>
-                            <input type="number" name="skill_long_passing" min="0" max="100" value="60" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Vision</label>
-                            <input type="number" name="mentality_vision" min="0" max="100" value="65" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Curve</label>
-                            <input type="number" name="skill_curve" min="0" max="100" value="65" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Finishing</label>
-                            <input type="number" name="attacking_finishing" min="0" max="100" value="70" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Shot Power</label>
-                            <input type="number" name="power_shot_power" min="0" max="100" value="75" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Positioning</label>
-                            <input type="number" name="mentality_positioning" min="0" max="100" value="70" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Interceptions</label>
-                            <input type="number" name="mentality_interceptions" min="0" max="100" value="50" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Standing Tackle</label>
-                            <input type="number" name="defending_standing_tackle" min="0" max="100" value="50" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Sliding Tackle</label>
-                            <input type="number" name="defending_sliding_tackle" min="0" max="100" value="50" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Aggression</label>
-                            <input type="number" name="mentality_aggression" min="0" max="100" value="60" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Strength</label>
-                            <input type="number" name="power_strength" min="0" max="100" value="70" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Stamina</label>
-                            <input type="number" name="power_stamina" min="0" max="100" value="75" required>
-                        </div>
-                        <div class="attribute-item">
-                            <label>Jumping</label>
-                            <input type="number" name="power_jumping" min="0" max="100" value="70" required>
-                        </div>
-                    </div>
-                    
-                    <button type="submit">🔮 Predict Player Style</button>
-                </form>
-                
-                <div class="loading" id="predict-loading">
-                    <div class="spinner"></div>
-                    <p style="margin-top: 10px;">Analyzing player attributes...</p>
-                </div>
-                
-                <div class="error" id="predict-error"></div>
-                
-                <div class="result" id="predict-result">
-                    <h3>🎯 Prediction Result</h3>
-                    <div class="result-content" id="predict-content"></div>
-                </div>
-            </div>
-            
-            <!-- Find Similar Tab -->
-            <div id="similar-tab" class="tab-content">
-                <div class="info-box">
-                    <h4>Find Similar Players</h4>
-                    <p>Enter a player's name to find players with similar playing styles based on their attributes.</p>
-                </div>
-                
-                <form id="similar-form">
-                    <div class="form-group">
-                        <label>Player Name</label>
-                        <input type="text" name="player_name" placeholder="e.g., Mbappé, Messi, Ronaldo" required>
-                    </div>
-                    
-                    <div class="form-group">
-                        <label>Number of Similar Players</label>
-                        <input type="number" name="top_n" min="1" max="20" value="5" required>
-                    </div>
-                    
-                    <button type="submit">🔍 Find Similar Players</button>
-                </form>
-                
-                <div class="loading" id="similar-loading">
-                    <div class="spinner"></div>
-                    <p style="margin-top: 10px;">Searching for similar players...</p>
-                </div>
-                
-                <div class="error" id="similar-error"></div>
-                
-                <div class="result" id="similar-result">
-                    <h3>🔍 Similar Players Found</h3>
-                    <div class="result-content" id="similar-content"></div>
-                </div>
-            </div>
-            
-            <!-- View Clusters Tab -->
-            <div id="clusters-tab" class="tab-content">
-                <div class="info-box">
-                    <h4>Player Style Archetypes</h4>
-                    <p>These are the 6 distinct playing styles discovered by the ML clustering algorithm.</p>
-                </div>
-                
-                <div class="loading" id="clusters-loading">
-                    <div class="spinner"></div>
-                    <p style="margin-top: 10px;">Loading cluster information...</p>
-                </div>
-                
-                <div class="result show" id="clusters-result" style="display: none;">
-                    <div id="clusters-content"></div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="card" style="text-align: center; padding: 20px;">
-            <p style="color: #666;">
-                Built with ❤️ using FastAPI, scikit-learn, and KMeans Clustering<br>
-                <a href="/docs" style="color: #667eea; text-decoration: none;">📚 API Documentation</a> | 
-                <a href="/health" style="color: #667eea; text-decoration: none;">💚 Health Check</a>
-            </p>
-        </div>
-    </div>
+
+# In-process /similar_players results, least recently used first. Only the
+# event loop touches it, so it needs no lock.
+_similar_lru: "OrderedDict[Tuple[str, int], Tuple[str, ...]]" = OrderedDict()
+
+
+def _similar_lru_get(key: Tuple[str, int]) -> Optional[Tuple[str, ...]]:
+    """Cached similar-player names for (player_name, top_n), if any"""
+    names = _similar_lru.get(key)
+    if names is not None:
+        _similar_lru.move_to_end(key)
+    return names
+
+
+def _similar_lru_put(key: Tuple[str, int], names: Tuple[str, ...]):
+    """Cache similar-player names, evicting the least recently used entry"""
+    _similar_lru[key] = names
+    _similar_lru.move_to_end(key)
+    if len(_similar_lru) > SIMILAR_LRU_SIZE:
+        _similar_lru.popitem(last=False)
+
+
+def _artifact_digest(*paths: str) -> str:
+    """Short content hash of model artifact files"""
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+async def _redis_get(key: str) -> Optional[bytes]:
+    """Read from the shared response cache; a cache outage is treated as a miss"""
+    if redis_client is None:
+        return None
+    try:
+        return await redis_client.get(key)
+    except (RedisError, OSError) as e:
+        print(f"⚠️  Redis cache read failed: {e}")
+        return None
+
+
+async def _redis_set(key: str, value: str):
+    """Write to the shared response cache, ignoring cache outages"""
+    if redis_client is None:
+        return
+    try:
+        await redis_client.set(key, value, ex=SIMILAR_CACHE_TTL)
+    except (RedisError, OSError) as e:
+        print(f"⚠️  Redis cache write failed: {e}")
+
+
+async def _similar_shared(request: SimilarPlayerRequest) -> Tuple[str, ...]:
+    """Similar-player names from the shared Redis cache, else from a fresh search"""
+    cache_key = None
+    if redis_client is not None:
+        cache_key = similar_cache_prefix + hashlib.sha1(
+            request.model_dump_json().encode('utf-8')
+        ).hexdigest()
+        cached = await _redis_get(cache_key)
+        if cached is not None:
+            return tuple(json.loads(cached))
     
-    <script>
-        // Tab switching
-        function switchTab(tabName) {
-            // Hide all tabs
-            document.querySelectorAll('.tab-content').forEach(tab => {
-                tab.classList.remove('active');
-            });
-            document.querySelectorAll('.tab').forEach(tab => {
-                tab.classList.remove('active');
-            });
-            
-            // Show selected tab
-            document.getElementById(tabName + '-tab').classList.add('active');
-            event.target.classList.add('active');
-            
-            // Load clusters if clusters tab is selected
-            if (tabName === 'clusters') {
-                loadClusters();
-            }
-        }
-        
-        // Preset player profiles
-        const presets = {
-            winger: {
-                movement_acceleration: 90,
-                movement_sprint_speed: 92,
-                skill_dribbling: 88,
-                skill_ball_control: 85,
-                movement_agility: 88,
-                movement_balance: 82,
-                attacking_short_passing: 75,
-                skill_long_passing: 65,
-                mentality_vision: 70,
-                skill_curve: 72,
-                attacking_finishing: 80,
-                power_shot_power: 82,
-                mentality_positioning: 85,
-                mentality_interceptions: 35,
-                defending_standing_tackle: 30,
-                defending_sliding_tackle: 28,
-                mentality_aggression: 50,
-                power_strength: 65,
-                power_stamina: 88,
-                power_jumping: 70
-            },
-            playmaker: {
-                movement_acceleration: 70,
-                movement_sprint_speed: 68,
-                skill_dribbling: 85,
-                skill_ball_control: 90,
-                movement_agility: 80,
-                movement_balance: 75,
-                attacking_short_passing: 92,
-                skill_long_passing: 88,
-                mentality_vision: 95,
-                skill_curve: 85,
-                attacking_finishing: 65,
-                power_shot_power: 70,
-                mentality_positioning: 75,
-                mentality_interceptions: 65,
-                defending_standing_tackle: 55,
-                defending_sliding_tackle: 50,
-                mentality_aggression: 60,
-                power_strength: 60,
-                power_stamina: 75,
-                power_jumping: 60
-            },
-            defender: {
-                movement_acceleration: 65,
-                movement_sprint_speed: 70,
-                skill_dribbling: 50,
-                skill_ball_control: 60,
-                movement_agility: 62,
-                movement_balance: 70,
-                attacking_short_passing: 65,
-                skill_long_passing: 60,
-                mentality_vision: 60,
-                skill_curve: 50,
-                attacking_finishing: 35,
-                power_shot_power: 55,
-                mentality_positioning: 70,
-                mentality_interceptions: 88,
-                defending_standing_tackle: 90,
-                defending_sliding_tackle: 85,
-                mentality_aggression: 82,
-                power_strength: 85,
-                power_stamina: 78,
-                power_jumping: 88
-            },
-            striker: {
-                movement_acceleration: 80,
-                movement_sprint_speed: 85,
-                skill_dribbling: 75,
-                skill_ball_control: 78,
-                movement_agility: 72,
-                movement_balance: 70,
-                attacking_short_passing: 70,
-                skill_long_passing: 55,
-                mentality_vision: 65,
-                skill_curve: 68,
-                attacking_finishing: 92,
-                power_shot_power: 88,
-                mentality_positioning: 90,
-                mentality_interceptions: 30,
-                defending_standing_tackle: 32,
-                defending_sliding_tackle: 28,
-                mentality_aggression: 65,
-                power_strength: 80,
-                power_stamina: 80,
-                power_jumping: 85
-            }
-        };
-        
-        function loadPreset(type) {
-            const preset = presets[type];
-            const form = document.getElementById('predict-form');
-            
-            Object.keys(preset).forEach(key => {
-                const input = form.querySelector(`input[name="${key}"]`);
-                if (input) {
-                    input.value = preset[key];
-                }
-            });
-        }
-        
-        // Predict form submission
-        document.getElementById('predict-form').addEventListener('submit', async (e) => {
-            e.preventDefault();
-            
-            const formData = new FormData(e.target);
-            const data = {};
-            formData.forEach((value, key) => {
-                data[key] = parseFloat(value);
-            });
-            
-            // Show loading
-            document.getElementById('predict-loading').classList.add('show');
-            document.getElementById('predict-result').classList.remove('show');
-            document.getElementById('predict-error').classList.remove('show');
-            
-            try {
-                const response = await fetch('/cluster', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify(data)
-                });
-                
-                if (!response.ok) {
-                    throw new Error('Prediction failed');
-                }
-                
-                const result = await response.json();
-                
-                // Display result
-                document.getElementById('predict-content').innerHTML = `
-                    <p style="font-size: 1.2em;">This player is classified as:</p>
-                    <div class="cluster-badge">
-                        ${result.style}
-                    </div>
-                    <p style="margin-top: 20px; color: #666;">
-                        <strong>Cluster ID:</strong> ${result.cluster_id}
-                    </p>
-                `;
-                
-                document.getElementById('predict-result').classList.add('show');
-            } catch (error) {
-                document.getElementById('predict-error').textContent = 
-                    'Error: Unable to predict player style. Please try again.';
-                document.getElementById('predict-error').classList.add('show');
-            } finally {
-                document.getElementById('predict-loading').classList.remove('show');
-            }
-        });
-        
-        // Similar players form submission
-        document.getElementById('similar-form').addEventListener('submit', async (e) => {
-            e.preventDefault();
-            
-            const formData = new FormData(e.target);
-            const data = {
-                player_name: formData.get('player_name'),
-                top_n: parseInt(formData.get('top_n'))
-            };
-            
-            // Show loading
-            document.getElementById('similar-loading').classList.add('show');
-            document.getElementById('similar-result').classList.remove('show');
-            document.getElementById('similar-error').classList.remove('show');
-            
-            try {
-                const response = await fetch('/similar_players', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify(data)
-                });
-                
-                if (!response.ok) {
-                    throw new Error('Search failed');
-                }
-                
-                const result = await response.json();
-                
-                // Display result
-                let html = `<p style="font-size: 1.1em; margin-bottom: 15px;">
-                    Players similar to <strong>${data.player_name}</strong>:
-                </p>
-                <ul class="player-list">`;
-                
-                result.similar_players.forEach((player, index) => {
-                    html += `<li>🎯 ${index + 1}. ${player}</li>`;
-                });
-                
-                html += '</ul>';
-                
-                document.getElementById('similar-content').innerHTML = html;
-                document.getElementById('similar-result').classList.add('show');
-            } catch (error) {
-                document.getElementById('similar-error').textContent = 
-                    'Error: Player not found or search failed. Please check the player name and try again.';
-                document.getElementById('similar-error').classList.add('show');
-            } finally {
-                document.getElementById('similar-loading').classList.remove('show');
-            }
-        });
-        
-        // Load clusters
-        async function loadClusters() {
-            const loading = document.getElementById('clusters-loading');
-            const result = document.getElementById('clusters-result');
-            const content = document.getElementById('clusters-content');
-            
-            loading.classList.add('show');
-            
-            try {
-                const response = await fetch('/clusters');
-                if (!response.ok) {
-                    throw new Error('Failed to load clusters');
-                }
-                
-                const clusters = await response.json();
-                
-                let html = '<div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px;">';
-                
-                const descriptions = {
-                    "Creative Playmaker": "High creativity, vision, and passing. Masters of orchestrating attacks.",
-                    "Ball Winning Midfielder": "Defensive specialists with high interceptions and tackling.",
-                    "Explosive Winger": "Speed demons with exceptional pace and dribbling ability.",
-                    "Target Man": "Physical strikers who dominate in the air and hold up play.",
-                    "Defensive Center Back": "Defensive rocks with strength and positioning.",
-                    "Box-to-Box Midfielder": "Balanced all-rounders who excel in all areas."
-                };
-                
-                const icons = {
-                    "Creative Playmaker": "🎨",
-                    "Ball Winning Midfielder": "🛡️",
-                    "Explosive Winger": "⚡",
-                    "Target Man": "🎯",
-                    "Defensive Center Back": "🏰",
-                    "Box-to-Box Midfielder": "⚙️"
-                };
-                
-                Object.entries(clusters).forEach(([id, name]) => {
-                    html += `
-                        <div style="background: white; padding: 20px; border-radius: 15px; box-shadow: 0 4px 10px rgba(0,0,0,0.1);">
-                            <div style="font-size: 3em; margin-bottom: 10px;">${icons[name] || '⚽'}</div>
-                            <h4 style="color: #667eea; margin-bottom: 10px; font-size: 1.3em;">${name}</h4>
-                            <p style="color: #666; line-height: 1.6;">${descriptions[name] || 'Unique playing style'}</p>
-                            <div style="margin-top: 15px; padding-top: 15px; border-top: 2px solid #f0f0f0;">
-                                <span style="color: #999; font-size: 0.9em;">Cluster ID: ${id}</span>
-                            </div>
-                        </div>
-                    `;
-                });
-                
-                html += '</div>';
-                
-                content.innerHTML = html;
-                result.style.display = 'block';
-            } catch (error) {
-                content.innerHTML = '<p style="color: #c33;">Error loading cluster information.</p>';
-                result.style.display = 'block';
-            } finally {
-                loading.classList.remove('show');
-            }
-        }
-    </script>
-</body>
-</html>
-"""
+    # NumPy releases the GIL, so run the search off the event loop
+    similar_names = await asyncio.to_thread(
+        _similar_core, request.player_name, request.top_n
+    )
+    if cache_key is not None:
+        await _redis_set(cache_key, json.dumps(similar_names))
+    return similar_names
 
 
 # ============================================================================
@@ -931,24 +664,99 @@ HTML_TEMPLATE = """
 @app.on_event("startup")
 async def load_models():
     """Load model artifacts on startup"""
-    global scaler, kmeans, cluster_labels, player_data
+    global cluster_labels, cluster_labels_etag, player_names, player_info, name_to_idx
+    global player_names_lower, lower_name_to_idx
+    global scaler_mean, scaler_scale
+    global player_attr_matrix, attr_col_index, style_group_cols, style_empty_groups
+    global player_styles_scaled, player_styles_sqnorm, centroids, centroid_sqnorm
+    global player_clusters, player_query_scaled, redis_client, similar_cache_prefix
+    global scaler_params, centroid_rows
     
     try:
         print("🔄 Loading model artifacts...")
         
-        scaler = joblib.load('models/scaler.pkl')
+        # Inference only needs the scaler and centroid arrays, saved as raw
+        # .npy by train_model.py (no pickle, no sklearn estimators)
+        scaler_mean = np.load('models/scaler_mean.npy').astype(np.float32)
+        scaler_scale = np.load('models/scaler_scale.npy').astype(np.float32)
         print("  ✓ Loaded scaler")
         
-        kmeans = joblib.load('models/kmeans.pkl')
+        centroids = np.ascontiguousarray(np.load('models/centroids.npy'), dtype=np.float32)
+        centroid_sqnorm = (centroids ** 2).sum(axis=1)
+        scaler_params = list(zip(scaler_mean.tolist(), scaler_scale.tolist()))
+        centroid_rows = list(zip(centroid_sqnorm.tolist(), centroids.tolist()))
         print("  ✓ Loaded KMeans model")
         
-        with open('models/cluster_labels.json', 'r') as f:
-            cluster_labels = json.load(f)
+        with open('models/cluster_labels.json', 'rb') as f:
+            raw_labels = f.read()
+        cluster_labels = json.loads(raw_labels)
+        cluster_labels_etag = '"' + hashlib.sha1(raw_labels).hexdigest() + '"'
         print("  ✓ Loaded cluster labels")
         
-        # Load player data for similarity search
-        player_data = pd.read_csv('FC26.csv')
-        print(f"  ✓ Loaded {len(player_data):,} players from FC26.csv")
+        # Load player data exported by train_model.py for similarity search
+        with np.load('models/players.npz') as players:
+            player_attr_matrix = np.ascontiguousarray(players['attrs'], dtype=np.float32)
+            attr_col_index = {name: i for i, name in enumerate(players['attr_columns'].tolist())}
+            player_names = {col: players[f'names_{col}'] for col in players['name_columns'].tolist()}
+            player_info = {key: players[key] for key in ('age', 'overall', 'positions')
+                           if key in players.files}
+        print(f"  ✓ Loaded {len(player_attr_matrix):,} players")
+        
+        # Exact-name indexes (as stored and lowercased); earlier name columns
+        # and rows win on duplicates
+        player_names_lower = {col: np.char.lower(names) for col, names in player_names.items()}
+        name_to_idx = {}
+        lower_name_to_idx = {}
+        for name_col, names in player_names.items():
+            for idx, name in enumerate(names.tolist()):
+                name_to_idx.setdefault(name, (idx, name_col))
+            for idx, name in enumerate(player_names_lower[name_col].tolist()):
+                lower_name_to_idx.setdefault(name, (idx, name_col))
+        
+        # Precompute style dimensions for similarity search
+        style_group_cols, style_empty_groups = build_style_groups(attr_col_index)
+        player_styles = create_style_dimensions_batch(
+            player_attr_matrix, style_group_cols, style_empty_groups
+        )
+        player_styles_scaled = np.ascontiguousarray(
+            scale_features(player_styles), dtype=np.float32
+        )
+        player_styles_sqnorm = np.einsum('ij,ij->i', player_styles_scaled, player_styles_scaled)
+        print("  ✓ Cached player style matrix")
+        
+        # Scaled style of every player from the request attributes (default 50
+        # when missing): the similarity query vector and the /player/{name}
+        # cluster are then plain row lookups
+        canonical = canonical_attributes(player_attr_matrix, attr_col_index)
+        canonical_scaled = scale_features(canonical @ _GROUP_MATRIX.T)
+        player_clusters = predict_clusters(canonical_scaled).astype(np.int8)
+        player_query_scaled = canonical_scaled.astype(np.float32)
+        print("  ✓ Cached player cluster assignments")
+        
+        _predict_core.cache_clear()
+        _similar_lru.clear()
+        
+        if REDIS_URL and aioredis is None:
+            print("  ⚠️  REDIS_URL is set but the redis package is not installed; "
+                  "using the in-process cache only")
+        elif REDIS_URL:
+            # Shared entries are keyed by the artifacts that produced them, so
+            # a retrain never serves rankings from the previous model
+            similar_cache_prefix = "fc26:similar:{}:".format(_artifact_digest(
+                'models/players.npz', 'models/scaler_mean.npy',
+                'models/scaler_scale.npy', 'models/centroids.npy'
+            ))
+            if redis_client is not None:
+                await redis_client.aclose()
+            redis_client = aioredis.from_url(
+                REDIS_URL, socket_timeout=REDIS_TIMEOUT,
+                socket_connect_timeout=REDIS_TIMEOUT
+            )
+            try:
+                await redis_client.ping()
+                print("  ✓ Connected similar-players cache to Redis")
+            except (RedisError, OSError) as e:
+                print(f"  ⚠️  Redis unavailable ({e}); retrying on each request")
         
         print("✅ All models loaded successfully")
         
@@ -961,10 +769,37 @@ async def load_models():
         raise
 
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
+@app.on_event("shutdown")
+async def close_redis():
+    """Close the shared response cache connection pool"""
+    global redis_client
+    if redis_client is not None:
+        await redis_client.aclose()
+        redis_client = None
+
+
+@app.get("/", include_in_schema=False)
+async def root(request: Request):
     """Serve the web UI"""
-    return HTML_TEMPLATE
+    return _negotiated_response(request, _INDEX_RESPONSES, _INDEX_ETAG)
+
+
+@app.get("/static/app.css", include_in_schema=False)
+async def app_css(request: Request):
+    """Serve the web UI stylesheet"""
+    versioned = request.query_params.get('v') == _CSS_VERSION
+    return _negotiated_response(
+        request, _CSS_RESPONSES if versioned else _CSS_UNVERSIONED, _CSS_ETAG
+    )
+
+
+@app.get("/static/app.js", include_in_schema=False)
+async def app_js(request: Request):
+    """Serve the web UI script"""
+    versioned = request.query_params.get('v') == _JS_VERSION
+    return _negotiated_response(
+        request, _JS_RESPONSES if versioned else _JS_UNVERSIONED, _JS_ETAG
+    )
 
 
 @app.get("/health")
@@ -972,15 +807,18 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "ok",
-        "models_loaded": scaler is not None and kmeans is not None,
-        "total_players": len(player_data) if player_data is not None else 0
+        "models_loaded": scaler_mean is not None and centroids is not None,
+        "total_players": len(player_attr_matrix) if player_attr_matrix is not None else 0
     }
 
 
 @app.get("/clusters")
-async def get_clusters() -> Dict[str, str]:
+async def get_clusters(request: Request) -> Dict[str, str]:
     """List all player style clusters"""
-    return cluster_labels
+    headers = {"ETag": cluster_labels_etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, cluster_labels_etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(cluster_labels, headers=headers)
 
 
 @app.post("/cluster", response_model=PlayerPrediction)
@@ -992,15 +830,7 @@ async def predict_cluster(attributes: PlayerAttributes):
     Output: Cluster ID and style label
     """
     try:
-        # Convert to style dimensions
-        features = create_style_dimensions(attributes.dict())
-        
-        # Scale features
-        features_scaled = scaler.transform(features.reshape(1, -1))
-        
-        # Predict cluster
-        cluster_id = int(kmeans.predict(features_scaled)[0])
-        style = cluster_labels[str(cluster_id)]
+        cluster_id, style = _predict_core(attribute_values(attributes))
         
         return PlayerPrediction(
             cluster_id=cluster_id,
@@ -1011,6 +841,29 @@ async def predict_cluster(attributes: PlayerAttributes):
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 
+@app.post("/cluster_batch", response_model=BatchPredictionResponse)
+async def predict_cluster_batch(request: BatchPredictionRequest):
+    """
+    Predict style clusters for several players in one call
+    
+    Input: List of FIFA player attributes
+    Output: Cluster ID and style label per player
+    """
+    try:
+        # (B, 20) attributes -> (B, 6) style dimensions -> one centroid matmul
+        X = np.array([attribute_values(p) for p in request.players], dtype=np.float64)
+        features = X @ _GROUP_MATRIX.T
+        cluster_ids = predict_clusters(scale_features(features))
+        
+        return BatchPredictionResponse(predictions=[
+            PlayerPrediction(cluster_id=int(cid), style=cluster_labels[str(int(cid))])
+            for cid in cluster_ids
+        ])
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+
 @app.post("/similar_players", response_model=SimilarPlayerResponse)
 async def find_similar_players(request: SimilarPlayerRequest):
     """
@@ -1020,43 +873,36 @@ async def find_similar_players(request: SimilarPlayerRequest):
     Output: List of similar player names
     """
     try:
-        # Try multiple name columns
-        name_columns = ['short_name', 'name', 'long_name', 'player_name']
-        player_mask = None
-        name_col_used = None
-        
-        for name_col in name_columns:
-            if name_col in player_data.columns:
-                player_mask = player_data[name_col].str.contains(
-                    request.player_name, case=False, na=False
-                )
-                if player_mask.any():
-                    name_col_used = name_col
-                    break
-        
-        if player_mask is None or not player_mask.any():
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Player '{request.player_name}' not found in dataset"
-            )
-        
-        # Get player features
-        player_row = player_data[player_mask].iloc[0]
-        player_features = create_style_dimensions(player_row.to_dict())
-        player_scaled = scaler.transform(player_features.reshape(1, -1))
-        
-        # Calculate all player features
-        all_features = create_style_dimensions_batch(player_data)
-        all_scaled = scaler.transform(all_features)
-        
-        # Calculate distances
-        distances = np.linalg.norm(all_scaled - player_scaled, axis=1)
-        
-        # Get top N similar (excluding the player itself)
-        similar_indices = np.argsort(distances)[1:request.top_n + 1]
-        similar_names = player_data.iloc[similar_indices][name_col_used].tolist()
+        # The in-process cache answers repeats without a Redis round trip
+        lru_key = (request.player_name, request.top_n)
+        similar_names = _similar_lru_get(lru_key)
+        if similar_names is None:
+            similar_names = await _similar_shared(request)
+            _similar_lru_put(lru_key, similar_names)
+        
+        return SimilarPlayerResponse(similar_players=list(similar_names))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding similar players: {str(e)}")
+
+
+@app.post("/similar_players_batch", response_model=BatchSimilarPlayerResponse)
+async def find_similar_players_batch(request: BatchSimilarPlayerRequest):
+    """
+    Find players with similar playing style for several players in one call
+    
+    Input: List of player names and numbers of similar players
+    Output: List of similar player names per query
+    """
+    try:
+        queries = tuple((q.player_name, q.top_n) for q in request.queries)
+        results = await asyncio.to_thread(_similar_batch_core, queries)
         
-        return SimilarPlayerResponse(similar_players=similar_names)
+        return BatchSimilarPlayerResponse(results=[
+            SimilarPlayerResponse(similar_players=list(names)) for names in results
+        ])
     
     except HTTPException:
         raise
@@ -1068,39 +914,25 @@ async def find_similar_players(request: SimilarPlayerRequest):
 async def get_player_profile(player_name: str):
     """Get detailed player profile including cluster assignment"""
     try:
-        # Try multiple name columns
-        name_columns = ['short_name', 'name', 'long_name', 'player_name']
-        player_mask = None
-        name_col_used = None
-        
-        for name_col in name_columns:
-            if name_col in player_data.columns:
-                player_mask = player_data[name_col].str.contains(
-                    player_name, case=False, na=False
-                )
-                if player_mask.any():
-                    name_col_used = name_col
-                    break
-        
-        if player_mask is None or not player_mask.any():
+        # Exact names resolve inline; the substring scan over every name
+        # column runs off the event loop
+        match = find_player_exact(player_name)
+        if match is None:
+            match = await asyncio.to_thread(find_player, player_name)
+        if match is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Player '{player_name}' not found"
             )
+        player_idx, name_col_used = match
         
-        player = player_data[player_mask].iloc[0]
-        
-        # Get cluster prediction
-        features = create_style_dimensions(player.to_dict())
-        features_scaled = scaler.transform(features.reshape(1, -1))
-        cluster_id = int(kmeans.predict(features_scaled)[0])
+        cluster_id = int(player_clusters[player_idx])
         
         return {
-            "name": player[name_col_used],
-            "age": int(player['age']) if 'age' in player else None,
-            "overall": int(player['overall']) if 'overall' in player else None,
-            "positions": player['player_positions'] if 'player_positions' in player else 
-                        (player['positions'] if 'positions' in player else None),
+            "name": str(player_names[name_col_used][player_idx]),
+            "age": player_info_int('age', player_idx),
+            "overall": player_info_int('overall', player_idx),
+            "positions": str(player_info['positions'][player_idx]) if 'positions' in player_info else None,
             "cluster_id": cluster_id,
             "style": cluster_labels[str(cluster_id)]
         }
@@ -1108,4 +940,4 @@ async def get_player_profile(player_name: str):
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching player: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching player: {str(e)}")
@@ -0,0 +1,307 @@
+// Tab buttons and panels never change, so look them up once
+const TABS = document.querySelectorAll('.tab');
+const TAB_CONTENTS = document.querySelectorAll('.tab-content');
+const TAB_MAP = Object.fromEntries([...TAB_CONTENTS].map(el => [el.id.replace('-tab', ''), el]));
+
+// Tab switching
+function switchTab(tabName, btn) {
+    // Hide all tabs
+    for (let i = 0; i < TAB_CONTENTS.length; i++) {
+        TAB_CONTENTS[i].classList.remove('active');
+    }
+    for (let i = 0; i < TABS.length; i++) {
+        TABS[i].classList.remove('active');
+    }
+
+    // Show selected tab
+    TAB_MAP[tabName].classList.add('active');
+    btn.classList.add('active');
+
+    // Build the clusters grid the first time its tab is opened
+    if (tabName === 'clusters' && !_clustersBuilt) {
+        loadClusters();
+    }
+}
+
+// One delegated listener serves every tab button
+document.querySelector('[data-tabs]').addEventListener('click', (e) => {
+    const btn = e.target.closest('.tab');
+    if (btn) {
+        switchTab(btn.dataset.tab, btn);
+    }
+});
+
+// Attribute inputs of the predict form, in form order
+const ATTR_NAMES = Object.freeze([
+    'movement_acceleration', 'movement_sprint_speed', 'skill_dribbling',
+    'skill_ball_control', 'movement_agility', 'movement_balance',
+    'attacking_short_passing', 'skill_long_passing', 'mentality_vision',
+    'skill_curve', 'attacking_finishing', 'power_shot_power',
+    'mentality_positioning', 'mentality_interceptions', 'defending_standing_tackle',
+    'defending_sliding_tackle', 'mentality_aggression', 'power_strength',
+    'power_stamina', 'power_jumping'
+]);
+const predictForm = document.getElementById('predict-form');
+// Every named input of the predict form, resolved in one selector pass
+const FORM_INPUTS = new Map();
+predictForm.querySelectorAll('input[name]').forEach(el => FORM_INPUTS.set(el.name, el));
+const INPUTS = ATTR_NAMES.map(name => FORM_INPUTS.get(name));
+// JSON key prefixes of the /cluster payload, so a submit only joins numbers
+const FIELD_KEYS = ATTR_NAMES.map((name, i) => (i ? ',"' : '{"') + name + '":');
+
+// Preset player profiles: one row of ATTR_NAMES values per preset, row-major
+const PRESET_IDX = Object.freeze({ winger: 0, playmaker: 1, defender: 2, striker: 3 });
+const PRESETS = new Uint8Array([
+    90, 92, 88, 85, 88, 82, 75, 65, 70, 72, 80, 82, 85, 35, 30, 28, 50, 65, 88, 70,
+    70, 68, 85, 90, 80, 75, 92, 88, 95, 85, 65, 70, 75, 65, 55, 50, 60, 60, 75, 60,
+    65, 70, 50, 60, 62, 70, 65, 60, 60, 50, 35, 55, 70, 88, 90, 85, 82, 85, 78, 88,
+    80, 85, 75, 78, 72, 70, 70, 55, 65, 68, 92, 88, 90, 30, 32, 28, 65, 80, 80, 85
+]);
+
+function loadPreset(type) {
+    const offset = PRESET_IDX[type] * INPUTS.length;
+    for (let i = 0; i < INPUTS.length; i++) {
+        INPUTS[i].value = PRESETS[offset + i];
+    }
+}
+
+// In-flight request of each form, aborted when the form is submitted again
+let _predictCtl = null;
+let _similarCtl = null;
+
+// Predict form submission
+predictForm.addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    // The inputs are required numbers, so the browser has validated them
+    let body = '';
+    for (let i = 0; i < INPUTS.length; i++) {
+        body += FIELD_KEYS[i] + INPUTS[i].valueAsNumber;
+    }
+    body += '}';
+
+    // A new submit supersedes any request still in flight
+    if (_predictCtl) {
+        _predictCtl.abort();
+    }
+    const ctl = _predictCtl = new AbortController();
+
+    // Show loading
+    document.getElementById('predict-loading').classList.add('show');
+    document.getElementById('predict-result').classList.remove('show');
+    document.getElementById('predict-error').classList.remove('show');
+
+    try {
+        const response = await fetch('/cluster', {
+            method: 'POST',
+            signal: ctl.signal,
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body
+        });
+
+        if (!response.ok) {
+            throw new Error('Prediction failed');
+        }
+
+        const result = await response.json();
+
+        // Display result
+        document.getElementById('predict-content').innerHTML = `
+            <p style="font-size: 1.2em;">This player is classified as:</p>
+            <div class="cluster-badge">
+                ${result.style}
+            </div>
+            <p style="margin-top: 20px; color: #666;">
+                <strong>Cluster ID:</strong> ${result.cluster_id}
+            </p>
+        `;
+
+        document.getElementById('predict-result').classList.add('show');
+    } catch (error) {
+        if (error.name === 'AbortError') {
+            return;
+        }
+        document.getElementById('predict-error').textContent = 
+            'Error: Unable to predict player style. Please try again.';
+        document.getElementById('predict-error').classList.add('show');
+    } finally {
+        // Only the latest submit owns the spinner
+        if (_predictCtl === ctl) {
+            _predictCtl = null;
+            document.getElementById('predict-loading').classList.remove('show');
+        }
+    }
+});
+
+// Similar players form submission
+document.getElementById('similar-form').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = {
+        player_name: formData.get('player_name'),
+        top_n: parseInt(formData.get('top_n'))
+    };
+
+    // A new submit supersedes any request still in flight
+    if (_similarCtl) {
+        _similarCtl.abort();
+    }
+    const ctl = _similarCtl = new AbortController();
+
+    // Show loading
+    document.getElementById('similar-loading').classList.add('show');
+    document.getElementById('similar-result').classList.remove('show');
+    document.getElementById('similar-error').classList.remove('show');
+
+    try {
+        const response = await fetch('/similar_players', {
+            method: 'POST',
+            signal: ctl.signal,
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(data)
+        });
+
+        if (!response.ok) {
+            throw new Error('Search failed');
+        }
+
+        const result = await response.json();
+
+        // Display result, built off-document and attached in one write
+        const intro = document.createElement('p');
+        intro.style.cssText = 'font-size: 1.1em; margin-bottom: 15px;';
+        const queried = document.createElement('strong');
+        queried.textContent = data.player_name;
+        intro.append('Players similar to ', queried, ':');
+
+        const list = document.createElement('ul');
+        list.className = 'player-list';
+        const items = document.createDocumentFragment();
+        result.similar_players.forEach((player, index) => {
+            const item = document.createElement('li');
+            item.textContent = `🎯 ${index + 1}. ${player}`;
+            items.appendChild(item);
+        });
+        list.appendChild(items);
+
+        document.getElementById('similar-content').replaceChildren(intro, list);
+        document.getElementById('similar-result').classList.add('show');
+    } catch (error) {
+        if (error.name === 'AbortError') {
+            return;
+        }
+        document.getElementById('similar-error').textContent = 
+            'Error: Player not found or search failed. Please check the player name and try again.';
+        document.getElementById('similar-error').classList.add('show');
+    } finally {
+        // Only the latest submit owns the spinner
+        if (_similarCtl === ctl) {
+            _similarCtl = null;
+            document.getElementById('similar-loading').classList.remove('show');
+        }
+    }
+});
+
+// Display details of each cluster style
+const CLUSTER_DESCRIPTIONS = Object.freeze({
+    "Creative Playmaker": "High creativity, vision, and passing. Masters of orchestrating attacks.",
+    "Ball Winning Midfielder": "Defensive specialists with high interceptions and tackling.",
+    "Explosive Winger": "Speed demons with exceptional pace and dribbling ability.",
+    "Target Man": "Physical strikers who dominate in the air and hold up play.",
+    "Defensive Center Back": "Defensive rocks with strength and positioning.",
+    "Box-to-Box Midfielder": "Balanced all-rounders who excel in all areas."
+});
+
+const CLUSTER_ICONS = Object.freeze({
+    "Creative Playmaker": "🎨",
+    "Ball Winning Midfielder": "🛡️",
+    "Explosive Winger": "⚡",
+    "Target Man": "🎯",
+    "Defensive Center Back": "🏰",
+    "Box-to-Box Midfielder": "⚙️"
+});
+
+// Cluster labels only change when the model is retrained: keep them for the
+// session, and across sessions revalidate the stored copy by its ETag
+const CLUSTERS_KEY = 'clusters-v1';
+
+async function fetchClusters() {
+    const cached = sessionStorage.getItem(CLUSTERS_KEY);
+    if (cached) {
+        return JSON.parse(cached);
+    }
+
+    const stored = JSON.parse(localStorage.getItem(CLUSTERS_KEY) || 'null');
+    const response = await fetch('/clusters', {
+        headers: stored ? { 'If-None-Match': stored.etag } : {}
+    });
+
+    let clusters;
+    if (response.status === 304 && stored) {
+        clusters = stored.clusters;
+    } else if (response.ok) {
+        clusters = await response.json();
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            localStorage.setItem(CLUSTERS_KEY, JSON.stringify({ etag, clusters }));
+        }
+    } else {
+        throw new Error('Failed to load clusters');
+    }
+
+    sessionStorage.setItem(CLUSTERS_KEY, JSON.stringify(clusters));
+    return clusters;
+}
+
+// Start loading the clusters while the user is still on the first tab; a
+// failed prefetch resolves to null and the tab fetches again when opened
+const _clustersPromise = fetchClusters().catch(() => null);
+
+// Set once the clusters grid has been rendered; it never changes afterwards
+let _clustersBuilt = false;
+
+// Load clusters
+async function loadClusters() {
+    const loading = document.getElementById('clusters-loading');
+    const result = document.getElementById('clusters-result');
+    const content = document.getElementById('clusters-content');
+
+    loading.classList.add('show');
+
+    try {
+        const clusters = (await _clustersPromise) || await fetchClusters();
+
+        const grid = document.createElement('div');
+        grid.style.cssText = 'display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px;';
+        const tmpl = document.getElementById('cluster-card-tmpl').content;
+
+        const ids = Object.keys(clusters);
+        for (let i = 0; i < ids.length; i++) {
+            const id = ids[i];
+            const name = clusters[id];
+            const icon = CLUSTER_ICONS[name] || '⚽';
+            const description = CLUSTER_DESCRIPTIONS[name] || 'Unique playing style';
+
+            const card = tmpl.cloneNode(true);
+            card.querySelector('[data-slot=icon]').textContent = icon;
+            card.querySelector('[data-slot=name]').textContent = name;
+            card.querySelector('[data-slot=description]').textContent = description;
+            card.querySelector('[data-slot=id]').textContent = id;
+            grid.appendChild(card);
+        }
+
+        content.replaceChildren(grid);
+        result.style.display = 'block';
+        _clustersBuilt = true;
+    } catch (error) {
+        content.innerHTML = '<p style="color: #c33;">Error loading cluster information.</p>';
+        result.style.display = 'block';
+    } finally {
+        loading.classList.remove('show');
+    }
+}
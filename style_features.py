@@ -0,0 +1,54 @@
+"""
+Football Player Style Clustering - Style Dimension Means
+NaN-skipping attribute group means shared by the training pipeline and the API
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; group_nanmeans falls back to NumPy
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _group_nanmeans(values, col_idx, starts, stops, out):
+        """Fill out[row, g] with the NaN-skipping mean of the columns col_idx[starts[g]:stops[g]]"""
+        for row in range(values.shape[0]):
+            for group in range(starts.shape[0]):
+                total = 0.0
+                count = 0
+                for k in range(starts[group], stops[group]):
+                    value = values[row, col_idx[k]]
+                    if not np.isnan(value):
+                        total += value
+                        count += 1
+                out[row, group] = total / count if count > 0 else np.nan
+
+
+def group_nanmeans(values: np.ndarray, groups: list, dtype=np.float64) -> np.ndarray:
+    """Per-row means of each list of column indices in groups, skipping NaNs
+
+    Rows with no values in a group get NaN, matching pandas' skipna mean.
+    """
+    out = np.empty((len(values), len(groups)), dtype=dtype)
+    if not groups:
+        return out
+
+    lengths = np.array([len(cols) for cols in groups], dtype=np.int64)
+    stops = np.cumsum(lengths)
+    starts = stops - lengths
+    col_idx = np.array([col for cols in groups for col in cols], dtype=np.int64)
+
+    if njit is not None:
+        _group_nanmeans(values, col_idx, starts, stops, out)
+        return out
+
+    gathered = values[:, col_idx]
+    present = ~np.isnan(gathered)
+    sums = np.add.reduceat(np.where(present, gathered, 0.0), starts, axis=1, dtype=np.float64)
+    counts = np.add.reduceat(present, starts, axis=1, dtype=np.int64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[:] = sums / counts
+    return out
@@ -6,12 +6,21 @@ Trains KMeans model on FIFA player attribute data
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 import joblib
 import json
 from pathlib import Path
 import os
 
+from style_features import group_nanmeans
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; load_data then always parses the CSV
+    pa = pq = None
+
+
 class PlayerStyleTrainer:
     """Trains and saves player style clustering model"""
     
@@ -36,6 +45,12 @@ class PlayerStyleTrainer:
                        'strength', 'stamina', 'jumping']
     }
     
+    # Player name columns, in lookup priority order
+    NAME_COLUMNS = ['short_name', 'name', 'long_name', 'player_name']
+    
+    # Non-attribute columns used for statistics and the exported player data
+    INFO_COLUMNS = ['age', 'overall', 'player_positions', 'positions']
+    
     # Cluster interpretations
     CLUSTER_LABELS = {
         0: "Creative Playmaker",
@@ -46,27 +61,61 @@ class PlayerStyleTrainer:
         5: "Box-to-Box Midfielder"
     }
     
-    def __init__(self, data_path: str = 'FC26.csv', n_clusters: int = 6):
+    def __init__(self, data_path: str = 'FC26.csv', n_clusters: int = 6,
+                 use_minibatch: bool = False):
         self.data_path = data_path
         self.n_clusters = n_clusters
         self.scaler = StandardScaler()
-        self.kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        if use_minibatch:
+            # Cheaper fits for large datasets or hyperparameter sweeps; cluster
+            # ids may differ from the full fit that CLUSTER_LABELS describes
+            self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42,
+                                          batch_size=4096, n_init=3, max_iter=300)
+        else:
+            self.kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
         self.feature_columns = []
+        # Style features and their scaled form from the last train() call
+        self.features = None
+        self.X_scaled = None
         
     def load_data(self) -> pd.DataFrame:
         """Load and validate FC26 dataset"""
         print(f"📊 Loading dataset from {self.data_path}...")
-        df = pd.read_csv(self.data_path)
         
-        print(f"✓ Loaded {len(df):,} players with {len(df.columns)} columns")
+        # Only parse the columns training and export read
+        needed = {col for attrs in self.STYLE_DIMENSIONS.values() for col in attrs}
+        needed.update(self.NAME_COLUMNS, self.INFO_COLUMNS)
+        
+        # Columnar copy of the needed columns, rebuilt whenever the CSV is
+        # newer or the needed columns change
+        csv_path = Path(self.data_path)
+        cache_path = csv_path.with_suffix('.parquet')
+        df = None
+        if (pq is not None and cache_path.exists()
+                and cache_path.stat().st_mtime >= csv_path.stat().st_mtime):
+            header = pd.read_csv(csv_path, nrows=0).columns
+            if pq.read_schema(cache_path).names == [col for col in header if col in needed]:
+                df = pd.read_parquet(cache_path)
+        
+        if df is None:
+            df = pd.read_csv(csv_path, usecols=lambda col: col in needed)
+            if pq is not None:
+                # The cache only speeds up later runs; failing to write it is harmless
+                try:
+                    df.to_parquet(cache_path, index=False)
+                    print(f"✓ Cached dataset as {cache_path}")
+                except (OSError, pa.ArrowException) as e:
+                    print(f"  ⚠️  Could not cache dataset as {cache_path}: {e}")
+        
+        print(f"✓ Loaded {len(df):,} players with {len(df.columns)} relevant columns")
         return df
     
     def engineer_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Create style dimension features"""
         print("⚙️  Engineering style dimensions...")
         
-        feature_df = pd.DataFrame()
         self.feature_columns = []
+        dimension_attrs = {}
         
         for dimension, possible_attributes in self.STYLE_DIMENSIONS.items():
             # Find which attributes actually exist in the dataframe
@@ -75,13 +124,26 @@ class PlayerStyleTrainer:
             if not available_attrs:
                 print(f"  ⚠️  Warning: No columns found for {dimension}")
                 print(f"      Looked for: {possible_attributes[:3]}...")
-                feature_df[dimension] = 50.0
             else:
-                # Calculate mean of available attributes
-                feature_df[dimension] = df[available_attrs].mean(axis=1)
+                dimension_attrs[dimension] = available_attrs
                 self.feature_columns.append(dimension)
                 print(f"  ✓ {dimension:12s}: using {len(available_attrs)} attributes")
         
+        # One pandas -> NumPy conversion for every attribute, then each
+        # dimension is a NaN-skipping row mean over its column indices
+        all_attrs = list(dict.fromkeys(col for attrs in dimension_attrs.values() for col in attrs))
+        col_index = {col: i for i, col in enumerate(all_attrs)}
+        values = df[all_attrs].to_numpy(dtype=np.float64)
+        features = np.full((len(df), len(self.STYLE_DIMENSIONS)), 50.0)
+        targets = [j for j, dimension in enumerate(self.STYLE_DIMENSIONS) if dimension in dimension_attrs]
+        groups = [[col_index[col] for col in dimension_attrs[dimension]]
+                  for dimension in self.STYLE_DIMENSIONS if dimension in dimension_attrs]
+        
+        if groups:
+            features[:, targets] = group_nanmeans(values, groups)
+        
+        feature_df = pd.DataFrame(features, index=df.index, columns=list(self.STYLE_DIMENSIONS))
+        
         # Handle missing values
         feature_df = feature_df.fillna(feature_df.mean())
         
@@ -103,6 +165,8 @@ class PlayerStyleTrainer:
         
         # Get cluster assignments
         df['cluster'] = self.kmeans.labels_
+        self.features = features
+        self.X_scaled = X_scaled
         
         # Calculate cluster statistics
         stats = self._calculate_cluster_stats(df, features)
@@ -117,22 +181,29 @@ class PlayerStyleTrainer:
         """Calculate statistics for each cluster"""
         stats = {}
         
+        # Per-cluster aggregates in one grouped pass each
+        clusters = df['cluster']
+        counts = clusters.value_counts()
+        style_profiles = features.groupby(clusters.values).mean().reindex(range(self.n_clusters))
+        avg_overall = (df.groupby('cluster')['overall'].mean()
+                       if 'overall' in df.columns else None)
+        
+        name_col = next((col for col in ('short_name', 'name') if col in df.columns), None)
+        # Row positions of each cluster, so samples are positional slices
+        # rather than one boolean mask over every row per cluster
+        cluster_rows = df.groupby('cluster').indices
+        
         for cluster_id in range(self.n_clusters):
-            cluster_mask = df['cluster'] == cluster_id
-            cluster_features = features[cluster_mask]
-            
             # Get sample players
             sample_players = []
-            if 'short_name' in df.columns:
-                sample_players = df[cluster_mask]['short_name'].head(5).tolist()
-            elif 'name' in df.columns:
-                sample_players = df[cluster_mask]['name'].head(5).tolist()
+            if name_col is not None and cluster_id in cluster_rows:
+                sample_players = df[name_col].iloc[cluster_rows[cluster_id][:5]].tolist()
             
             stats[cluster_id] = {
-                'count': int(cluster_mask.sum()),
-                'avg_overall': float(df[cluster_mask]['overall'].mean()) 
-                              if 'overall' in df.columns else None,
-                'style_profile': cluster_features.mean().to_dict(),
+                'count': int(counts.get(cluster_id, 0)),
+                'avg_overall': float(avg_overall.get(cluster_id, np.nan))
+                              if avg_overall is not None else None,
+                'style_profile': style_profiles.loc[cluster_id].to_dict(),
                 'label': self.CLUSTER_LABELS.get(cluster_id, f"Cluster {cluster_id}"),
                 'sample_players': sample_players
             }
@@ -153,6 +224,12 @@ class PlayerStyleTrainer:
         joblib.dump(self.kmeans, f'{output_dir}/kmeans.pkl')
         print(f"  ✓ Saved kmeans.pkl")
         
+        # Save the raw arrays inference needs, so the API can skip sklearn
+        np.save(f'{output_dir}/scaler_mean.npy', self.scaler.mean_)
+        np.save(f'{output_dir}/scaler_scale.npy', self.scaler.scale_)
+        np.save(f'{output_dir}/centroids.npy', self.kmeans.cluster_centers_)
+        print(f"  ✓ Saved scaler_mean.npy, scaler_scale.npy, centroids.npy")
+        
         # Save cluster labels
         with open(f'{output_dir}/cluster_labels.json', 'w') as f:
             json.dump(self.CLUSTER_LABELS, f, indent=2)
@@ -169,7 +246,38 @@ class PlayerStyleTrainer:
         
         print("✓ All artifacts saved successfully")
     
-    def visualize_clusters(self, df: pd.DataFrame, features: pd.DataFrame):
+    def save_player_data(self, df: pd.DataFrame, output_dir: str = 'models'):
+        """Save player names, metadata and style attributes for the API"""
+        print(f"💾 Saving player data to {output_dir}/players.npz...")
+        
+        Path(output_dir).mkdir(exist_ok=True)
+        
+        attr_columns = [col for attrs in self.STYLE_DIMENSIONS.values()
+                        for col in attrs if col in df.columns]
+        name_columns = [col for col in self.NAME_COLUMNS if col in df.columns]
+        
+        arrays = {
+            'attrs': df[attr_columns].to_numpy(dtype=np.float32),
+            'attr_columns': np.array(attr_columns, dtype=str),
+            'name_columns': np.array(name_columns, dtype=str),
+        }
+        for col in name_columns:
+            arrays[f'names_{col}'] = df[col].fillna('').to_numpy(dtype=str)
+        for col in ('age', 'overall'):
+            if col in df.columns:
+                # -1 marks a missing value; int32 arrays cannot hold NaN
+                arrays[col] = df[col].fillna(-1).to_numpy(dtype=np.int32)
+        for col in ('player_positions', 'positions'):
+            if col in df.columns:
+                arrays['positions'] = df[col].fillna('').to_numpy(dtype=str)
+                break
+        
+        # Plain unicode/numeric arrays, so the API can load them without pickle
+        np.savez(f'{output_dir}/players.npz', **arrays)
+        print(f"  ✓ Saved {len(df):,} players ({len(attr_columns)} attributes)")
+    
+    def visualize_clusters(self, df: pd.DataFrame, features: pd.DataFrame,
+                           X_scaled: np.ndarray = None):
         """Create cluster visualization"""
         try:
             from sklearn.decomposition import PCA
@@ -179,7 +287,9 @@ class PlayerStyleTrainer:
             
             # Reduce to 2D for visualization
             pca = PCA(n_components=2, random_state=42)
-            X_pca = pca.fit_transform(self.scaler.transform(features))
+            if X_scaled is None:
+                X_scaled = self.scaler.transform(features)
+            X_pca = pca.fit_transform(X_scaled)
             
             # Plot
             plt.figure(figsize=(14, 10))
@@ -238,10 +348,10 @@ def main():
     
     # Save artifacts
     trainer.save_artifacts()
+    trainer.save_player_data(df)
     
-    # Optional visualization
-    features = trainer.engineer_features(df)
-    trainer.visualize_clusters(df, features)
+    # Optional visualization, reusing the features computed during training
+    trainer.visualize_clusters(df, trainer.features, trainer.X_scaled)
     
     print("\n" + "=" * 70)
     print("✅ Training complete! Model ready for deployment.")